@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import random
+import numpy as np
+
+# Format del magatzem de rutes (un directori):
+#   nodes.txt    -> un nom de node per línia; el número de línia és l'índex del node.
+#   paths.bin    -> int32 plans amb tots els camins concatenats. El primer element de cada
+#                   camí és l'índex absolut del node; la resta són diferències (deltes)
+#                   respecte del node anterior.
+#   index.bin    -> un registre per ruta (INDEX_DTYPE) amb l'origen, el destí, la posició
+#                   final del camí dins de paths.bin i la distància total.
+# Tots els fitxers només s'amplien pel final, de manera que es poden escriure mentre es
+# calculen les rutes i llegir amb np.memmap sense carregar-los sencers a memòria. L'escriptor
+# bolca els nodes i els camins abans d'escriure els registres de l'índex que els fan servir, i
+# el lector llegeix l'índex abans que la resta, de manera que tota ruta visible és completa.
+
+NODES_FILE = "nodes.txt"
+PATHS_FILE = "paths.bin"
+INDEX_FILE = "index.bin"
+
+PATH_DTYPE = np.dtype('<i4')
+INDEX_DTYPE = np.dtype([
+    ('origin', '<i4'),
+    ('destination', '<i4'),
+    ('end', '<i8'),
+    ('total_distance', '<f8'),
+])
+
+
+def _read_nodes(directory: str) -> list:
+    """
+    Llegeix la taula de noms de nodes d'un magatzem.
+
+    :param directory: El directori del magatzem.
+    :return: Una llista amb el nom de cada node segons el seu índex.
+    """
+    nodes_path = os.path.join(directory, NODES_FILE)
+    if not os.path.exists(nodes_path):
+        return []
+    with open(nodes_path, 'rb') as file:
+        content = file.read()
+    # Un nom que l'escriptor encara no ha acabat d'escriure no té salt de línia final
+    content = content[:content.rfind(b'\n') + 1]
+    return content.decode('utf-8').splitlines()
+
+
+class RouteStoreWriter:
+    """
+    Escriu rutes a un magatzem binari de manera incremental.
+
+    Les rutes s'afegeixen una a una amb append(); si el directori ja conté un magatzem,
+    les noves rutes s'hi afegeixen al final i conserven els índexs de nodes existents.
+    Els registres de l'índex es guarden en memòria i s'escriuen en blocs de "batch_size"
+    rutes, sempre després de bolcar a disc els nodes i els camins corresponents.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._recover()
+        self.nodes = _read_nodes(directory)
+        self.node_index = {name: i for i, name in enumerate(self.nodes)}
+        self._nodes_file = open(os.path.join(directory, NODES_FILE), 'a', encoding='utf-8')
+        self._paths_file = open(os.path.join(directory, PATHS_FILE), 'ab')
+        self._index_file = open(os.path.join(directory, INDEX_FILE), 'ab')
+        self._end = os.path.getsize(os.path.join(directory, PATHS_FILE)) // PATH_DTYPE.itemsize
+        self.count = os.path.getsize(os.path.join(directory, INDEX_FILE)) // INDEX_DTYPE.itemsize
+        self.batch_size = batch_size
+        self._pending = []
+
+    def _recover(self):
+        # Un escriptor interromput pot haver deixat un registre d'índex incomplet, camins sense
+        # cap registre que hi apunti o un nom de node a mitges; es retallen abans d'afegir-hi res
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        paths_path = os.path.join(self.directory, PATHS_FILE)
+        nodes_path = os.path.join(self.directory, NODES_FILE)
+        for path in (index_path, paths_path, nodes_path):
+            open(path, 'ab').close()
+
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        end = 0
+        with open(index_path, 'r+b') as file:
+            file.truncate(count * INDEX_DTYPE.itemsize)
+            if count:
+                file.seek((count - 1) * INDEX_DTYPE.itemsize)
+                end = int(np.frombuffer(file.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)[0]['end'])
+        with open(paths_path, 'r+b') as file:
+            file.truncate(end * PATH_DTYPE.itemsize)
+        with open(nodes_path, 'r+b') as file:
+            content = file.read()
+            file.truncate(content.rfind(b'\n') + 1)
+
+    def _node_id(self, name: str) -> int:
+        if name not in self.node_index:
+            self.node_index[name] = len(self.nodes)
+            self.nodes.append(name)
+            self._nodes_file.write(name + '\n')
+        return self.node_index[name]
+
+    def append(self, origin: str, destination: str, path: list, total_distance: float) -> int:
+        """
+        Afegeix una ruta al magatzem.
+
+        :param origin: El node d'origen.
+        :param destination: El node de destí.
+        :param path: La llista de nodes del camí.
+        :param total_distance: La distància total del camí.
+        :return: L'identificador (posició) de la ruta afegida.
+        """
+        ids = np.fromiter((self._node_id(str(node)) for node in path), dtype=np.int64, count=len(path))
+        deltas = np.diff(ids, prepend=0).astype(PATH_DTYPE)
+        self._paths_file.write(deltas.tobytes())
+        self._end += len(deltas)
+
+        self._pending.append((self._node_id(str(origin)), self._node_id(str(destination)),
+                              self._end, total_distance))
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return self.count - 1
+
+    def flush(self):
+        """
+        Bolca a disc les rutes escrites fins ara perquè un lector les pugui veure.
+        """
+        # Els nodes i els camins es bolquen abans d'escriure l'índex perquè un lector mai vegi
+        # una ruta sense el seu camí
+        self._nodes_file.flush()
+        self._paths_file.flush()
+        if self._pending:
+            self._index_file.write(np.array(self._pending, dtype=INDEX_DTYPE).tobytes())
+            self._pending = []
+        self._index_file.flush()
+
+    def close(self):
+        self.flush()
+        self._nodes_file.close()
+        self._paths_file.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RouteStore:
+    """
+    Lector d'un magatzem de rutes amb accés aleatori per identificador de ruta.
+
+    Els camins i l'índex es projecten a memòria amb np.memmap, de manera que obrir el
+    magatzem no llegeix les rutes i cada consulta només toca les dades de la ruta demanada.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # L'índex es llegeix primer: l'escriptor bolca els nodes i els camins abans de cada
+        # registre, així que tot el que apunta l'índex llegit ja és a disc
+        self.index = self._memmap(INDEX_FILE, INDEX_DTYPE)
+        self.nodes = _read_nodes(directory)
+        self.paths = self._memmap(PATHS_FILE, PATH_DTYPE)
+
+    def _memmap(self, filename: str, dtype: np.dtype) -> np.ndarray:
+        path = os.path.join(self.directory, filename)
+        count = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def path_ids(self, route_id: int) -> np.ndarray:
+        """
+        Retorna el camí d'una ruta com a índexs de nodes.
+
+        :param route_id: L'identificador de la ruta.
+        :return: Un array amb l'índex de cada node del camí.
+        """
+        if not 0 <= route_id < len(self.index):
+            raise IndexError(f"La ruta {route_id} no existeix al magatzem.")
+        start = int(self.index[route_id - 1]['end']) if route_id > 0 else 0
+        end = int(self.index[route_id]['end'])
+        return np.cumsum(self.paths[start:end], dtype=np.int64)
+
+    def __getitem__(self, route_id: int) -> dict:
+        path = self.path_ids(route_id)
+        record = self.index[route_id]
+        return {
+            'origin': self.nodes[record['origin']],
+            'destination': self.nodes[record['destination']],
+            'path': [self.nodes[i] for i in path],
+            'total_distance': float(record['total_distance'])
+        }
+
+    def __iter__(self):
+        for route_id in range(len(self)):
+            yield self[route_id]
+
+
+def json_to_store(json_filename: str, directory: str) -> int:
+    """
+    Converteix un fitxer JSON de rutes calculades (com calculated_routes.json) a un magatzem.
+
+    :param json_filename: El fitxer JSON d'origen.
+    :param directory: El directori del magatzem de destí.
+    :return: El nombre de rutes convertides.
+    """
+    with open(json_filename, 'r') as file:
+        routes = json.load(file)
+    with RouteStoreWriter(directory) as writer:
+        for route in routes:
+            writer.append(route['origin'], route['destination'], route['path'], route['total_distance'])
+    return len(routes)
+
+
+def store_to_json(directory: str, json_filename: str) -> int:
+    """
+    Converteix un magatzem de rutes al format JSON de calculated_routes.json.
+
+    :param directory: El directori del magatzem d'origen.
+    :param json_filename: El fitxer JSON de destí.
+    :return: El nombre de rutes convertides.
+    """
+    store = RouteStore(directory)
+    with open(json_filename, 'w') as file:
+        json.dump(list(store), file, indent=4)
+    return len(store)
+
+
+def store_size(directory: str) -> int:
+    """
+    Retorna la mida en bytes de tots els fitxers d'un magatzem.
+    """
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for name in (NODES_FILE, PATHS_FILE, INDEX_FILE)
+               if os.path.exists(os.path.join(directory, name)))
+
+
+def compare_formats(json_filename: str, directory: str, samples: int = 1000) -> dict:
+    """
+    Compara la mida i el temps de lectura del fitxer JSON i del magatzem equivalent.
+
+    Es mesura el temps d'obrir cada format i el de llegir "samples" rutes a l'atzar.
+    Amb JSON, llegir una sola ruta obliga a carregar el fitxer sencer.
+
+    :param json_filename: El fitxer JSON de rutes.
+    :param directory: El directori del magatzem amb les mateixes rutes.
+    :param samples: El nombre de rutes a llegir a l'atzar.
+    :return: Un diccionari amb les mides (bytes) i els temps (segons) de cada format.
+    """
+    start = time.perf_counter()
+    with open(json_filename, 'r') as file:
+        routes = json.load(file)
+    json_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = RouteStore(directory)
+    store_load = time.perf_counter() - start
+
+    route_ids = [random.randrange(len(store)) for _ in range(samples)] if len(store) else []
+    start = time.perf_counter()
+    for route_id in route_ids:
+        store[route_id]
+    store_lookup = time.perf_counter() - start
+
+    return {
+        'routes': len(routes),
+        'json_bytes': os.path.getsize(json_filename),
+        'store_bytes': store_size(directory),
+        'json_load_seconds': json_load,
+        'store_load_seconds': store_load,
+        'store_lookup_seconds': store_lookup,
+        'lookups': len(route_ids)
+    }
+
+
+def main():
+    input_filename = "calculated_routes.json"
+    store_directory = "calculated_routes.store"
+
+    if not os.path.exists(os.path.join(store_directory, INDEX_FILE)):
+        total = json_to_store(input_filename, store_directory)
+        print(f"S'han convertit {total} rutes a '{store_directory}'.")
+
+    result = compare_formats(input_filename, store_directory)
+    print(f"Rutes: {result['routes']}")
+    print(f"Mida JSON: {result['json_bytes']} bytes, mida magatzem: {result['store_bytes']} bytes "
+          f"({result['json_bytes'] / max(result['store_bytes'], 1):.1f}x més petit)")
+    print(f"Càrrega JSON: {result['json_load_seconds']:.4f} s, obertura magatzem: {result['store_load_seconds']:.4f} s")
+    print(f"{result['lookups']} lectures aleatòries del magatzem: {result['store_lookup_seconds']:.4f} s")
+
+
+if __name__ == '__main__':
+    main()
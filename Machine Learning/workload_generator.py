@@ -0,0 +1,334 @@
+import re
+import json
+import time
+import numpy as np
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371
+
+# Coordenades (longitud, latitud) aproximades de Vilanova i la Geltrú, centre dels grafs sintètics
+SYNTHETIC_CENTER = (1.7250, 41.2240)
+
+# Nombre de consultes generades amb cada generador aleatori derivat de la llavor. És fix perquè
+# la càrrega depengui només de la llavor i no de la mida dels blocs que s'escriuen a disc.
+BLOCK_SIZE = 65536
+
+
+def load_graph(edges_filename: str, nodes_filename: str):
+    """
+    Carrega un graf real en el format de conexion_nodos.txt i info_nodos.txt.
+
+    :param edges_filename: Fitxer d'arestes amb línies "puntA, puntB, distancia, temps".
+    :param nodes_filename: Fitxer de nodes amb línies "[id], [lon,lat], [adreça], [estat]".
+    :return: Una tupla (noms, coordenades, arestes): un array amb el nom de cada node, un array
+             (N, 2) amb la longitud i la latitud de cada node i un array (E, 2) d'arestes dirigides
+             expressades amb els índexs dels nodes.
+    """
+    regex_node = re.compile(r"^\[([^\]]+)\], \[([-+]?\d*\.?\d+),([-+]?\d*\.?\d+)\]")
+    names = []
+    coords = []
+    with open(nodes_filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            match = regex_node.match(line)
+            if match:
+                names.append(match.group(1))
+                coords.append((float(match.group(2)), float(match.group(3))))
+    index = {name: i for i, name in enumerate(names)}
+
+    edges = []
+    with open(edges_filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line == 'END OF INPUT':
+                continue
+            pointA, pointB = line.split(", ")[:2]
+            # Les arestes amb algun extrem sense coordenades no es poden fer servir per generar consultes
+            if pointA in index and pointB in index:
+                edges.append((index[pointA], index[pointB]))
+
+    return np.array(names), np.array(coords, dtype=np.float64), np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def synthetic_graph(rows: int, cols: int, spacing_km: float = 0.1, seed: int = 0):
+    """
+    Genera un graf sintètic en forma de quadrícula al voltant de Vilanova.
+
+    Cada node està connectat en els dos sentits amb els seus veïns de la dreta i de sota, i les
+    coordenades tenen un petit soroll perquè les distàncies no siguin totes iguals.
+
+    :param rows: El nombre de files de la quadrícula.
+    :param cols: El nombre de columnes de la quadrícula.
+    :param spacing_km: La separació aproximada entre nodes veïns, en km.
+    :param seed: La llavor del generador aleatori.
+    :return: Una tupla (noms, coordenades, arestes) amb el mateix format que load_graph().
+    """
+    rng = np.random.default_rng(seed)
+    lon0, lat0 = SYNTHETIC_CENTER
+    dlat = np.degrees(spacing_km / EARTH_RADIUS_KM)
+    dlon = dlat / np.cos(np.radians(lat0))
+
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    coords = np.column_stack((lon0 + (c - cols / 2) * dlon, lat0 + (r - rows / 2) * dlat))
+    coords += rng.normal(scale=0.1, size=coords.shape) * (dlon, dlat)
+    names = np.char.add('Node', np.arange(1, rows * cols + 1).astype(str))
+
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    right = np.column_stack((ids[:, :-1].ravel(), ids[:, 1:].ravel()))
+    down = np.column_stack((ids[:-1, :].ravel(), ids[1:, :].ravel()))
+    edges = np.concatenate((right, down))
+    edges = np.concatenate((edges, edges[:, ::-1]))
+    return names, coords, edges
+
+
+def save_graph(filename: str, names, coords, edges, speed_kmh: float = 30.0):
+    """
+    Escriu un graf en el format de conexion_nodos.txt perquè el pugui llegir el cercador de rutes.
+
+    :param filename: El fitxer de sortida.
+    :param names: Els noms dels nodes.
+    :param coords: Les coordenades (longitud, latitud) dels nodes.
+    :param edges: Les arestes dirigides com a parelles d'índexs.
+    :param speed_kmh: La velocitat mitjana per estimar el temps de cada aresta.
+    """
+    distance_km = haversine(coords[edges[:, 0]], coords[edges[:, 1]])
+    # Mateixes unitats que conexion_nodos.txt: distància en metres i temps en segons
+    lines = [f"{a}, {b}, {d:.3f}, {t:.3f}" for a, b, d, t in zip(
+        names[edges[:, 0]], names[edges[:, 1]], distance_km * 1000, distance_km / speed_kmh * 3600)]
+    with open(filename, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+
+
+def haversine(coords1, coords2):
+    """
+    Calcula la distància en km entre dues col·leccions de coordenades (longitud, latitud).
+
+    :param coords1: Array (N, 2) de coordenades.
+    :param coords2: Array (N, 2) de coordenades, o de forma compatible per broadcasting.
+    :return: Un array amb la distància de cada parella.
+    """
+    lon1, lat1 = np.radians(coords1[..., 0]), np.radians(coords1[..., 1])
+    lon2, lat2 = np.radians(coords2[..., 0]), np.radians(coords2[..., 1])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def largest_strongly_connected_component(num_nodes: int, edges) -> np.ndarray:
+    """
+    Troba la component fortament connexa més gran d'un graf dirigit (algorisme de Kosaraju iteratiu).
+
+    Qualsevol parella de nodes d'aquesta component té camí en els dos sentits, de manera que les
+    consultes generades sempre tenen solució.
+
+    :param num_nodes: El nombre de nodes del graf.
+    :param edges: Les arestes dirigides com a parelles d'índexs.
+    :return: Un array amb els índexs dels nodes de la component.
+    """
+    forward = defaultdict(list)
+    backward = defaultdict(list)
+    for a, b in edges.tolist():
+        forward[a].append(b)
+        backward[b].append(a)
+
+    # Primer recorregut: ordre de finalització en profunditat
+    visited = [False] * num_nodes
+    order = []
+    for start in range(num_nodes):
+        if visited[start]:
+            continue
+        visited[start] = True
+        stack = [(start, iter(forward[start]))]
+        while stack:
+            node, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    visited[neighbor] = True
+                    stack.append((neighbor, iter(forward[neighbor])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+
+    # Segon recorregut sobre el graf invers en ordre de finalització decreixent
+    component = [-1] * num_nodes
+    sizes = []
+    for start in reversed(order):
+        if component[start] != -1:
+            continue
+        label = len(sizes)
+        component[start] = label
+        stack = [start]
+        size = 0
+        while stack:
+            node = stack.pop()
+            size += 1
+            for neighbor in backward[node]:
+                if component[neighbor] == -1:
+                    component[neighbor] = label
+                    stack.append(neighbor)
+        sizes.append(size)
+
+    if not sizes:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.array(component) == int(np.argmax(sizes)))
+
+
+def hotspot_weights(coords, rng, hotspots: int = 0, radius_km: float = 0.5, background: float = 0.1):
+    """
+    Calcula la probabilitat de triar cada node com a origen o destí.
+
+    Sense punts calents tots els nodes són equiprobables. Amb punts calents, es trien "hotspots"
+    nodes a l'atzar com a centres (com a màxim, tants com nodes candidats) i el pes de cada node
+    és una suma de gaussianes al voltant dels centres més un pes de fons.
+
+    :param coords: Les coordenades dels nodes candidats.
+    :param rng: El generador aleatori de numpy.
+    :param hotspots: El nombre de punts calents.
+    :param radius_km: L'amplada (desviació) de cada punt calent, en km.
+    :param background: El pes relatiu del fons respecte del pic d'un punt calent.
+    :return: Un array de probabilitats que suma 1.
+    """
+    if hotspots <= 0:
+        return np.full(len(coords), 1 / len(coords))
+    centers = coords[rng.choice(len(coords), size=min(hotspots, len(coords)), replace=False)]
+    distance_km = haversine(coords[:, None, :], centers[None, :, :])
+    weights = np.exp(-0.5 * (distance_km / radius_km) ** 2).sum(axis=1) + background
+    return weights / weights.sum()
+
+
+def sample_target_distance(rng, size: int, distribution: str, mean_km: float, std_km: float):
+    """
+    Genera les distàncies (en línia recta) desitjades entre origen i destí.
+
+    :param rng: El generador aleatori de numpy.
+    :param size: El nombre de distàncies a generar.
+    :param distribution: "uniform" (sense preferència), "exponential" o "normal".
+    :param mean_km: La distància mitjana, en km.
+    :param std_km: La desviació de la distància, en km (només per a "normal").
+    :return: Un array de distàncies, o None si la distribució és "uniform".
+    """
+    if distribution == 'uniform':
+        return None
+    if distribution == 'exponential':
+        return rng.exponential(mean_km, size=size)
+    if distribution == 'normal':
+        return np.abs(rng.normal(mean_km, std_km, size=size))
+    raise ValueError(f"Distribució de distàncies desconeguda: {distribution}")
+
+
+def generate_workload(names, coords, edges, n: int, seed: int = 0, chunk_size: int = 100000,
+                      distribution: str = 'uniform', mean_km: float = 2.0, std_km: float = 1.0,
+                      hotspots: int = 0, hotspot_radius_km: float = 0.5, candidates: int = 16):
+    """
+    Genera consultes origen-destí sobre un graf, per blocs.
+
+    Els orígens i els destins només es trien de la component fortament connexa més gran, de manera
+    que totes les consultes tenen ruta. Per ajustar la distància, per a cada origen es trien
+    "candidates" destins a l'atzar i es queda el que té la distància més propera a l'objectiu.
+
+    :param names: Els noms dels nodes.
+    :param coords: Les coordenades (longitud, latitud) dels nodes.
+    :param edges: Les arestes dirigides com a parelles d'índexs.
+    :param n: El nombre total de consultes.
+    :param seed: La llavor del generador aleatori; la mateixa llavor (i els mateixos paràmetres de
+                 distribució) dona la mateixa càrrega, sigui quin sigui "chunk_size".
+    :param chunk_size: El nombre màxim de consultes de cada bloc retornat.
+    :param distribution: La distribució de distàncies (vegeu sample_target_distance()).
+    :param mean_km: La distància mitjana, en km.
+    :param std_km: La desviació de la distància, en km.
+    :param hotspots: El nombre de punts calents (vegeu hotspot_weights()).
+    :param hotspot_radius_km: L'amplada de cada punt calent, en km.
+    :param candidates: El nombre de destins candidats per origen.
+    :return: Un generador de tuples (origens, destins, distancies_km) amb arrays de noms i distàncies.
+    """
+    rng = np.random.default_rng(seed)
+    nodes = largest_strongly_connected_component(len(names), edges)
+    if len(nodes) < 2:
+        raise ValueError("El graf no té cap component connexa amb més d'un node.")
+    node_coords = coords[nodes]
+    weights = hotspot_weights(node_coords, rng, hotspots, hotspot_radius_km)
+
+    for block, block_start in enumerate(range(0, n, BLOCK_SIZE)):
+        # Cada bloc intern té el seu propi generador derivat de (llavor, bloc)
+        block_rng = np.random.default_rng((seed, block))
+        size = min(BLOCK_SIZE, n - block_start)
+        origins = block_rng.choice(len(nodes), size=size, p=weights)
+        target = sample_target_distance(block_rng, size, distribution, mean_km, std_km)
+        width = 1 if target is None else candidates
+        options = block_rng.choice(len(nodes), size=(size, width), p=weights)
+
+        # Un destí igual a l'origen es canvia pel node següent de la component
+        same = options == origins[:, None]
+        options[same] = (options[same] + 1) % len(nodes)
+
+        distance_km = haversine(node_coords[origins][:, None, :], node_coords[options])
+        if target is None:
+            best = np.zeros(size, dtype=np.int64)
+        else:
+            best = np.argmin(np.abs(distance_km - target[:, None]), axis=1)
+        destinations = options[np.arange(size), best]
+        distance_km = distance_km[np.arange(size), best]
+
+        # Es retorna el bloc intern en trossos que no passen d'un múltiple de "chunk_size"
+        position = block_start
+        while position < block_start + size:
+            end = min(block_start + size, (position // chunk_size + 1) * chunk_size)
+            piece = slice(position - block_start, end - block_start)
+            yield names[nodes[origins[piece]]], names[nodes[destinations[piece]]], distance_km[piece]
+            position = end
+
+
+def write_workload(filename: str, chunks, fmt: str = 'csv', speed_kmh: float = 30.0) -> int:
+    """
+    Escriu a disc les consultes generades, bloc a bloc, sense guardar-les totes a memòria.
+
+    :param filename: El fitxer de sortida.
+    :param chunks: Els blocs retornats per generate_workload().
+    :param fmt: "csv" (origin,destination,distance_km) o "json" (format de fictitious_routes.json).
+    :param speed_kmh: La velocitat mitjana per estimar el temps (només per a "json").
+    :return: El nombre de consultes escrites.
+    """
+    total = 0
+    with open(filename, 'w') as file:
+        if fmt == 'csv':
+            file.write("origin,destination,distance_km\n")
+        elif fmt == 'json':
+            file.write("[")
+        else:
+            raise ValueError(f"Format de sortida desconegut: {fmt}")
+
+        for origins, destinations, distance_km in chunks:
+            if fmt == 'csv':
+                lines = [f"{o},{d},{km:.4f}\n" for o, d, km in zip(
+                    origins.tolist(), destinations.tolist(), distance_km.tolist())]
+            else:
+                lines = [("," if total or i else "") + "\n    " + json.dumps({
+                    'origin': o,
+                    'destination': d,
+                    'distance': round(km, 2),
+                    'time': round(km / speed_kmh * 60, 2)
+                }) for i, (o, d, km) in enumerate(zip(
+                    origins.tolist(), destinations.tolist(), distance_km.tolist()))]
+            file.writelines(lines)
+            total += len(origins)
+
+        if fmt == 'json':
+            file.write("\n]\n")
+    return total
+
+
+def main():
+    edges_filename = "../inputs/DadesVilanova/conexion_nodos.txt"
+    nodes_filename = "../inputs/DadesVilanova/info_nodos.txt"
+    output_filename = "workload.csv"
+
+    names, coords, edges = load_graph(edges_filename, nodes_filename)
+
+    start = time.perf_counter()
+    chunks = generate_workload(names, coords, edges, n=1000000, seed=42,
+                               distribution='exponential', mean_km=1.5, hotspots=5)
+    total = write_workload(output_filename, chunks)
+    print(f"S'han generat {total} consultes a '{output_filename}' en {time.perf_counter() - start:.2f} s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+import os
+import json
+import heapq
+import argparse
+import tempfile
+from array import array
+
+# Valida y elimina aristas repetidas de un fichero de aristas de cualquier tamaño.
+#
+# A diferencia de elimina.py, no carga el fichero entero en memoria: las aristas se leen en
+# bloques de "chunk_size" líneas, cada bloque se ordena y se escribe en un fichero temporal,
+# y los ficheros temporales se fusionan ordenadamente (ordenación externa). Las aristas
+# conservan su sentido, de manera que "a b" y "b a" son aristas distintas (calles de sentido
+# único). Los datos que crecen con el grafo son los conjuntos de nodos, necesarios para
+# detectar nodos inexistentes y componentes desconectadas, y, para las componentes fuertemente
+# conexas, las aristas únicas guardadas como pares de enteros.
+
+MAX_REPORTED = 20  # Número máximo de ejemplos de cada problema que se guardan en el informe
+
+
+def parse_edge(line: str, separator: str = None):
+    """
+    Interpreta una línea de un fichero de aristas.
+
+    Acepta los dos formatos del repositorio:
+      - separado por espacios: "puntA puntB distancia"
+      - separado por comas: "puntA, puntB, distancia, tiempo" (el que lee read_file)
+
+    Args:
+        line (str): La línea sin el salto de línea final.
+        separator (str, optional): El separador del fichero (" " o ", "). Si se indica, las
+            líneas en el otro formato se consideran mal formadas; si no, se deduce de la línea.
+
+    Returns:
+        tuple: (puntA, puntB, pesos, separador, linea) con los pesos como tupla de floats y la
+               línea normalizada en su formato original, o None si la línea está mal formada.
+    """
+    if separator is None:
+        separator = ", " if "," in line else " "
+    parts = [part.strip() for part in line.split(separator.strip() or None)]
+    if len(parts) != (3 if separator == " " else 4):
+        return None
+    pointA, pointB = parts[0], parts[1]
+    if not pointA or not pointB or "\t" in pointA or "\t" in pointB:
+        return None
+    try:
+        weights = tuple(float(part) for part in parts[2:])
+    except ValueError:
+        return None
+    return pointA, pointB, weights, separator, separator.join(parts)
+
+
+def read_known_nodes(filename: str) -> set:
+    """
+    Lee los identificadores de nodo de info_nodos.txt ("[id], [lon,lat], ...") o info_nodos.json.
+
+    Args:
+        filename (str): El fichero de nodos.
+
+    Returns:
+        set: Los identificadores de nodo como cadenas.
+    """
+    if filename.endswith(".json"):
+        with open(filename, 'r', encoding='utf-8') as file:
+            return {str(node['id']) for node in json.load(file)}
+    nodes = set()
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.startswith('['):
+                nodes.add(line.split('], [')[0].strip('['))
+    return nodes
+
+
+def _write_run(records: list, directory: str) -> str:
+    records.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        file.writelines(records)
+    return path
+
+
+def _merge_runs(runs: list, directory: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    files = [open(run, 'r', encoding='utf-8') for run in runs]
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as output:
+            output.writelines(heapq.merge(*files))
+    finally:
+        for file in files:
+            file.close()
+        for run in runs:
+            os.remove(run)
+    return path
+
+
+def _union_find_root(parent: dict, node: str) -> str:
+    root = node
+    while parent[root] != root:
+        root = parent[root]
+    # Compresión de caminos
+    while parent[node] != root:
+        parent[node], node = root, parent[node]
+    return root
+
+
+def _strong_components(num_nodes: int, sources: array, targets: array) -> list:
+    # Tamaños de las componentes fuertemente conexas (algoritmo de Kosaraju iterativo sobre
+    # listas de adyacencia compactas: desplazamientos y vecinos en arrays de enteros)
+    def compact(origins, destinations):
+        offsets = array('q', [0]) * (num_nodes + 1)
+        for node in origins:
+            offsets[node + 1] += 1
+        for i in range(num_nodes):
+            offsets[i + 1] += offsets[i]
+        position = array('q', offsets)
+        neighbors = array('q', [0]) * len(origins)
+        for a, b in zip(origins, destinations):
+            neighbors[position[a]] = b
+            position[a] += 1
+        return offsets, neighbors
+
+    offsets, neighbors = compact(sources, targets)
+    visited = bytearray(num_nodes)
+    order = array('q')
+    for start in range(num_nodes):
+        if visited[start]:
+            continue
+        visited[start] = 1
+        stack = [(start, offsets[start])]
+        while stack:
+            node, i = stack[-1]
+            if i < offsets[node + 1]:
+                stack[-1] = (node, i + 1)
+                neighbor = neighbors[i]
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    stack.append((neighbor, offsets[neighbor]))
+            else:
+                stack.pop()
+                order.append(node)
+
+    offsets, neighbors = compact(targets, sources)
+    assigned = bytearray(num_nodes)
+    sizes = []
+    for start in reversed(order):
+        if assigned[start]:
+            continue
+        assigned[start] = 1
+        stack = [start]
+        size = 0
+        while stack:
+            node = stack.pop()
+            size += 1
+            for i in range(offsets[node], offsets[node + 1]):
+                if not assigned[neighbors[i]]:
+                    assigned[neighbors[i]] = 1
+                    stack.append(neighbors[i])
+        sizes.append(size)
+    return sizes
+
+
+def dedup_edges(input_path: str, output_path: str, nodes_path: str = None,
+                chunk_size: int = 100000, fan_in: int = 64, strong_components: bool = False) -> dict:
+    """
+    Elimina las aristas dirigidas repetidas de un fichero y valida su contenido.
+
+    Se consideran repetidas las líneas con el mismo origen y destino. Se conserva la que aparece
+    primero en el fichero; si las repetidas tienen pesos distintos se informa como conflicto. El
+    formato del fichero (espacios o comas) lo fija la primera arista válida, y las líneas en el
+    otro formato se consideran mal formadas. Las líneas mal formadas se informan y se copian sin
+    cambios al final del fichero de salida, para que no se pierda ningún dato. El fichero de
+    salida queda ordenado por origen y destino y puede ser el mismo que el de entrada.
+
+    Args:
+        input_path (str): El fichero de aristas de entrada.
+        output_path (str): El fichero de aristas de salida.
+        nodes_path (str, optional): Fichero info_nodos para detectar nodos inexistentes.
+        chunk_size (int): Número máximo de aristas en memoria durante la ordenación.
+        fan_in (int): Número máximo de ficheros temporales que se fusionan a la vez.
+        strong_components (bool): Si es True, calcula también las componentes fuertemente
+            conexas, para lo que guarda en memoria todas las aristas únicas como pares de enteros
+            (la memoria ya no queda limitada por "chunk_size"). Por defecto, False.
+
+    Returns:
+        dict: Un informe con el recuento de líneas, aristas, repetidas, conflictos, líneas mal
+              formadas, nodos inexistentes y componentes conexas (débiles y fuertes).
+    """
+    report = {
+        'lines': 0,
+        'edges': 0,
+        'duplicates': 0,
+        'conflicts': [],
+        'conflict_count': 0,
+        'malformed': [],
+        'malformed_count': 0,
+        'dangling_nodes': [],
+        'dangling_count': 0,
+        'components': 0,
+        'largest_component': 0,
+        'strong_components': None,
+        'largest_strong_component': None,
+        'isolated_nodes': 0,
+    }
+    directory = os.path.dirname(os.path.abspath(output_path))
+    end_of_input = False
+    separator = None
+    runs = []
+    fd, malformed_path = tempfile.mkstemp(suffix=".bad", dir=directory)
+    os.close(fd)
+    temporary_output = None
+
+    # Fase 1: leer por bloques, ordenar cada bloque y guardarlo en un fichero temporal
+    try:
+        records = []
+        with open(input_path, 'r', encoding='utf-8') as file, \
+                open(malformed_path, 'w', encoding='utf-8') as malformed:
+            for line_number, line in enumerate(file, start=1):
+                line = line.strip()
+                report['lines'] += 1
+                if not line:
+                    continue
+                if line == 'END OF INPUT':
+                    end_of_input = True
+                    continue
+                edge = parse_edge(line, separator)
+                if edge is None:
+                    report['malformed_count'] += 1
+                    if len(report['malformed']) < MAX_REPORTED:
+                        report['malformed'].append((line_number, line))
+                    malformed.write(line + '\n')
+                    continue
+                pointA, pointB, weights, separator, normalized = edge
+                # El tabulador ordena antes que cualquier carácter visible, así que el orden de
+                # las cadenas coincide con el orden por (origen, destino, número de línea)
+                records.append(f"{pointA}\t{pointB}\t{line_number:012d}\t{weights!r}\t{normalized}\n")
+                if len(records) >= chunk_size:
+                    runs.append(_write_run(records, directory))
+                    records = []
+        if records or not runs:
+            runs.append(_write_run(records, directory))
+        del records
+
+        # Fase 2: fusionar los ficheros temporales en pasadas de como máximo "fan_in" ficheros
+        while len(runs) > 1:
+            runs = [_merge_runs(runs[i:i + fan_in], directory) for i in range(0, len(runs), fan_in)]
+
+        # Fase 3: recorrer las aristas ordenadas, eliminar repetidas y validar
+        known_nodes = read_known_nodes(nodes_path) if nodes_path else None
+        dangling = set()
+        parent = {}
+        node_ids = {}
+        sources = array('q')
+        targets = array('q')
+        fd, temporary_output = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as output, open(runs[0], 'r', encoding='utf-8') as merged:
+            previous_key = None
+            previous_weights = None
+            previous_line = None
+            for record in merged:
+                pointA, pointB, _, weights, original = record.rstrip('\n').split('\t', 4)
+                if (pointA, pointB) == previous_key:
+                    report['duplicates'] += 1
+                    if weights != previous_weights:
+                        report['conflict_count'] += 1
+                        if len(report['conflicts']) < MAX_REPORTED:
+                            report['conflicts'].append((pointA, pointB, previous_line, original))
+                    continue
+                previous_key = (pointA, pointB)
+                previous_weights = weights
+                previous_line = original
+                output.write(original + '\n')
+                report['edges'] += 1
+
+                for node in (pointA, pointB):
+                    parent.setdefault(node, node)
+                    if known_nodes is not None and node not in known_nodes and node not in dangling:
+                        dangling.add(node)
+                if strong_components:
+                    sources.append(node_ids.setdefault(pointA, len(node_ids)))
+                    targets.append(node_ids.setdefault(pointB, len(node_ids)))
+                rootA = _union_find_root(parent, pointA)
+                rootB = _union_find_root(parent, pointB)
+                if rootA != rootB:
+                    parent[rootB] = rootA
+            # Las líneas mal formadas se conservan tal cual, después de las aristas válidas
+            with open(malformed_path, 'r', encoding='utf-8') as malformed:
+                for line in malformed:
+                    output.write(line)
+            if end_of_input:
+                output.write('END OF INPUT\n')
+        os.replace(temporary_output, output_path)
+    finally:
+        for run in runs + [malformed_path, temporary_output]:
+            if run is not None and os.path.exists(run):
+                os.remove(run)
+
+    # Componentes débilmente conexas: se ignora el sentido de las aristas
+    sizes = {}
+    for node in parent:
+        root = _union_find_root(parent, node)
+        sizes[root] = sizes.get(root, 0) + 1
+    report['components'] = len(sizes)
+    report['largest_component'] = max(sizes.values(), default=0)
+    if strong_components:
+        strong_sizes = _strong_components(len(node_ids), sources, targets)
+        report['strong_components'] = len(strong_sizes)
+        report['largest_strong_component'] = max(strong_sizes, default=0)
+    report['dangling_count'] = len(dangling)
+    report['dangling_nodes'] = sorted(dangling)[:MAX_REPORTED]
+    if known_nodes is not None:
+        report['isolated_nodes'] = len(known_nodes - parent.keys())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elimina aristas repetidas y valida un fichero de aristas.")
+    parser.add_argument("input", help="Fichero de aristas de entrada")
+    parser.add_argument("-o", "--output", help="Fichero de salida (por defecto, sobrescribe la entrada)")
+    parser.add_argument("-n", "--nodes", help="Fichero info_nodos.txt o info_nodos.json")
+    parser.add_argument("-c", "--chunk-size", type=int, default=100000,
+                        help="Número máximo de aristas en memoria (por defecto: 100000)")
+    parser.add_argument("--strong", action="store_true",
+                        help="Calcular también las componentes fuertemente conexas; guarda todas "
+                             "las aristas en memoria, así que la memoria no queda limitada por "
+                             "--chunk-size")
+    args = parser.parse_args()
+
+    report = dedup_edges(args.input, args.output or args.input, args.nodes, args.chunk_size,
+                         strong_components=args.strong)
+
+    print(f"Líneas leídas: {report['lines']}")
+    print(f"Aristas únicas: {report['edges']}")
+    print(f"Aristas repetidas eliminadas: {report['duplicates']} "
+          f"({report['conflict_count']} con pesos distintos)")
+    for pointA, pointB, kept, discarded in report['conflicts']:
+        print(f"   {pointA} -> {pointB}: se conserva \"{kept}\", se descarta \"{discarded}\"")
+    print(f"Líneas mal formadas (se copian sin cambios al final de la salida): {report['malformed_count']}")
+    for line_number, line in report['malformed']:
+        print(f"   línea {line_number}: {line}")
+    if args.nodes:
+        print(f"Nodos sin información en {args.nodes}: {report['dangling_count']}")
+        for node in report['dangling_nodes']:
+            print(f"   {node}")
+        print(f"Nodos sin ninguna arista: {report['isolated_nodes']}")
+    print(f"Componentes conexas (sin tener en cuenta el sentido): {report['components']} "
+          f"(la mayor con {report['largest_component']} nodos)")
+    if report['strong_components'] is not None:
+        print(f"Componentes fuertemente conexas: {report['strong_components']} "
+              f"(la mayor con {report['largest_strong_component']} nodos)")
+
+
+if __name__ == '__main__':
+    main()